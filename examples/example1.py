@@ -3,10 +3,10 @@ from zevents.dispatch import listener, Listener
 
 # We create events by subsclassing the zevents.Event class
 class TickEvent(Event):
-    pass
+    __slots__ = ()
 
 class QuitEvent(Event):
-    pass
+    __slots__ = ()
 
 # For a class to be able to listen at zevents, decorate it as listener
 @listener
@@ -46,8 +46,9 @@ class EchoApplication(Listener):
         """Starts the application event loop."""
         self.running = True
         while self.running:
-            # We send a Tick event in each loop
-            TickEvent.send()
+            # We broadcast a Tick event in each loop; Tick events carry no
+            # payload, so the allocation-free broadcast is enough
+            TickEvent.broadcast()
 
 if __name__ == "__main__":
     app = EchoApplication()
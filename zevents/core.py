@@ -3,14 +3,23 @@
 """Implements the ZEvents core system.
 """
 
-from collections import defaultdict, OrderedDict
-from contextlib import contextmanager
-import inspect
-import queue
+from collections import deque
 import re
 import threading
+import time
+from types import MethodType
 import weakref
 
+# Hoisted to module level to keep the subscription path free of
+# attribute lookups
+_ref = weakref.ref
+_weak_method = weakref.WeakMethod
+
+# Operation tags for entries of the pending-actions queue
+_SUBSCRIBE = 0
+_UNSUBSCRIBE = 1
+_NOTIFY = 2
+
 
 class EventManager:
     """Class responsible for the mechanics of event management.
@@ -18,82 +27,319 @@ class EventManager:
     EventManager provides the interface to subscribe or unsubscribe a
     handler to or from the notification feed of events of different types. This
     class also provides the method to fire an event object.
+
+    No mutex is ever held while user handlers run: dispatch iterates a
+    snapshot of the subscribers taken when the dispatch closure was built,
+    and callers that lose the draining flag enqueue their action and return
+    instead of blocking, so a slow or reentrant handler can never deadlock
+    or park another sender.
     """
 
-    def __init__(self):
+    def __init__(self, asynchronous=False):
+        """Initializes the manager.
+
+        When asynchronous is true, a daemon thread drains the queues and
+        runs the handlers, so senders only pay for an enqueue and a nudge
+        regardless of handler cost.
+        """
+        # Lock claimed, always non-blocking, by the thread currently
+        # draining. A real Lock rather than a GIL-guarded flag: a plain
+        # check-then-set can be interleaved by a thread switch between the
+        # read and the write on older CPythons, letting two drains run
+        # concurrently. _drainer mirrors the owner's thread ident so
+        # reentrant callers can be recognized without spinning
         self._lock = threading.Lock()
-        # Subscribers dictionnary. Keys are event types. Values are Orderdicts
-        # of weakly-referenced functions or methods
-        self._subscribers = defaultdict(OrderedDict)
-        # Queues for pending subscriptions, unsubscription and notifications
-        self._actions = queue.Queue()
+        self._drainer = None
+        # Subscribers dictionnary. Keys are event types. Values are dicts
+        # mapping handler keys to weakly-referenced functions or methods,
+        # in subscription order. A plain dict, so that lookups for event
+        # types without subscribers cannot grow it as a defaultdict would
+        self._subscribers = {}
+        # Dispatch closures compiled per event type, invalidated whenever
+        # the subscribers of that type change
+        self._dispatchers = {}
+        # Queue of tagged pending subscriptions, unsubscriptions and
+        # notifications, in the order they were requested. deque.append and
+        # popleft are atomic in CPython, and the drain always runs behind
+        # the draining flag, so a full queue.Queue is not needed
+        self._pending = deque()
+        # (event_type, key) pairs enqueued by weakref death callbacks,
+        # reaped at the next drain
+        self._dead = deque()
+        # In asynchronous mode, producers set this nudge to wake the
+        # dispatcher thread instead of draining themselves
+        self._nudge = None
+        if asynchronous:
+            self._nudge = threading.Event()
+            thread = threading.Thread(
+                target=self._dispatch_loop,
+                name="zevents-dispatcher",
+                daemon=True,
+            )
+            thread.start()
 
     def notify(self, event):
-        """Sends an event notification to all the subscribers."""
-        self._actions.put(['_notify', type(event), event])
-        # Process the queued subscriptions, unsubscriptions and notifications
-        with self._non_blocking_lock() as locked:
-            if locked: self._process_actions()
+        """Sends an event notification to all the subscribers.
+
+        Returns True when the event was dispatched before returning, False
+        when it had to be queued behind a concurrent dispatch.
+        """
+        if self._nudge is not None:
+            self._pending.append((_NOTIFY, event))
+            self._nudge.set()
+            return False
+        # On the uncontended path, dispatch directly instead of taking a
+        # round-trip through the actions queue
+        if self._try_lock():
+            try:
+                # Actions queued before this event keep their ordering
+                self._process_actions()
+                self._notify(type(event), event)
+                self._process_actions()
+            finally:
+                self._release()
+            return True
+        # The event type is not queued alongside: type(event) is a cheap
+        # C-level read, so the entry stays a minimal 2-tuple
+        self._pending.append((_NOTIFY, event))
+        return False
 
     def subscribe(self, event_type, handler):
         """Subscribes a handler function to the notification feed of a given
         event.
         """
-        self._actions.put(['_subscribe', event_type, handler])
+        if self._nudge is not None:
+            self._pending.append((_SUBSCRIBE, event_type, handler))
+            self._nudge.set()
+            return
+        # Apply directly when uncontended instead of a queue round-trip
+        if self._try_lock():
+            try:
+                # Actions queued before this one keep their ordering
+                self._process_actions()
+                self._subscribe(event_type, handler)
+            finally:
+                self._release()
+        else:
+            self._pending.append((_SUBSCRIBE, event_type, handler))
 
     def unsubscribe(self, event_type, handler):
         """Unsubscribes a handler function from the notification feed of a
         given event.
         """
-        self._actions.put(['_unsubscribe', event_type, handler])
+        if self._nudge is not None:
+            self._pending.append((_UNSUBSCRIBE, event_type, handler))
+            self._nudge.set()
+            return
+        if self._try_lock():
+            try:
+                self._process_actions()
+                self._unsubscribe(event_type, handler)
+            finally:
+                self._release()
+        else:
+            self._pending.append((_UNSUBSCRIBE, event_type, handler))
+
+    def _can_skip(self, event_type):
+        """Tells whether a notification of a given type can be skipped
+        outright.
+
+        True only when no handler is subscribed and no queued action could
+        still add one: a subscribe that lost the draining flag sits in the
+        pending queue without having bumped the counters yet, so the
+        counter alone is not enough to drop an event. Asynchronous managers
+        never skip, since their counters are maintained on the dispatcher
+        thread and may lag even while the queue looks empty.
+        """
+        return (self._nudge is None
+                and event_type._subscriber_count == 0
+                and not self._pending)
+
+    def _dispatch_loop(self):
+        """Drains the pending actions from the dedicated dispatcher thread.
+
+        The nudge is cleared before draining so that a set arriving while
+        handlers run is not lost, only coalesced into the next pass.
+        """
+        nudge = self._nudge
+        while True:
+            nudge.wait()
+            nudge.clear()
+            if self._try_lock():
+                try:
+                    self._process_actions()
+                finally:
+                    self._release()
+
+    def _try_lock(self, spins=64):
+        """Tries to claim the draining flag without blocking.
+
+        Instead of a single attempt, the thread yields and retries a few
+        times: the flag is typically only held for the duration of a short
+        handler call, so a brief retry loop catches it far more often than
+        a one-shot check, without ever parking the caller. When the caller
+        itself is the drainer - a handler firing another event during
+        dispatch - spinning could never succeed, so it fails fast and the
+        action joins the queue the outer drain is already working through.
+        """
+        ident = threading.get_ident()
+        if self._drainer == ident:
+            return False
+        acquire = self._lock.acquire
+        for _ in range(spins):
+            if acquire(blocking=False):
+                self._drainer = ident
+                return True
+            time.sleep(0)
+        return False
+
+    def _release(self):
+        """Releases the dispatch lock claimed through _try_lock."""
+        self._drainer = None
+        self._lock.release()
 
     def _process_actions(self):
-        """Processes pending actions."""
-        while not self._actions.empty():
-            action, *args = self._actions.get()
-            getattr(self, action)(*args)
+        """Processes pending actions in the order they were requested."""
+        if self._dead:
+            self._reap_dead()
+        pending = self._pending
+        while pending:
+            entry = pending.popleft()
+            op = entry[0]
+            if op is _NOTIFY:
+                event = entry[1]
+                event_type = type(event)
+                # Consecutive notifications of the same type share one
+                # dispatcher resolution, keeping the subscriber snapshot
+                # hot across the run
+                dispatcher = self._dispatchers.get(event_type)
+                if dispatcher is None:
+                    dispatcher = self._dispatchers.setdefault(
+                        event_type, self._build_dispatcher(event_type)
+                    )
+                dispatcher(event)
+                while (pending and pending[0][0] is _NOTIFY
+                        and type(pending[0][1]) is event_type):
+                    dispatcher(pending.popleft()[1])
+            elif op is _SUBSCRIBE:
+                self._subscribe(entry[1], entry[2])
+            else:
+                self._unsubscribe(entry[1], entry[2])
 
     def _subscribe(self, event_type, handler):
         """Subscribes an event handler."""
-        weak_handler = self._make_weakref(handler)
-        # We subscribe the handler to all superclass events
-        for klass in event_type.__mro__:
-            if issubclass(klass, Event):
-                self._subscribers[klass][weak_handler] = True
+        key = self._make_key(handler)
+        # The handler is stored once, under the type it subscribed to; the
+        # dispatcher builder merges the subclass tree so superclass events
+        # still reach it. Counters are bumped along the superclass chain
+        # since a send of any of those classes can now reach this handler
+        subscribers = self._subscribers.setdefault(event_type, {})
+        if key not in subscribers:
+            subscribers[key] = self._make_weakref(
+                handler, self._make_remover(event_type, key)
+            )
+            for klass in event_type._event_mro:
+                klass._subscriber_count += 1
+            self._dispatchers.clear()
 
     def _unsubscribe(self, event_type, handler):
         """Unsubscribes an event handler."""
-        weak_handler = self._make_weakref(handler)
-        for klass in event_type.__mro__:
-            if weak_handler in self._subscribers[klass]:
-                del self._subscribers[klass][weak_handler]
+        key = self._make_key(handler)
+        subscribers = self._subscribers.get(event_type)
+        if subscribers and subscribers.pop(key, None) is not None:
+            for klass in event_type._event_mro:
+                klass._subscriber_count -= 1
+            self._dispatchers.clear()
 
 
     def _notify(self, event_type, event):
         """Notifies subscribers."""
-        # We Empty the notification queue
-        for weak_handler in self._subscribers[event_type]:
-            handler = weak_handler()
-            handler(event)
-
-    def _make_weakref(self, handler):
-        """Builds a weakref to a handler function or method."""
-        # By default, suppose the handler is a function
-        ref = weakref.ref
-        # User WeakMethod if it is a bound method
-        if inspect.ismethod(handler) and hasattr(handler, '__self__'):
-            ref = weakref.WeakMethod
-        return ref(handler)
-
-    @contextmanager
-    def _non_blocking_lock(self):
-        """Context manager for non-blocking acquisition of self._lock."""
-        locked = self._lock.acquire(blocking=False)
-        try:
-            yield locked
-        finally:
-            if locked:
-                self._lock.release()
+        dispatcher = self._dispatchers.get(event_type)
+        if dispatcher is None:
+            dispatcher = self._dispatchers.setdefault(
+                event_type, self._build_dispatcher(event_type)
+            )
+        dispatcher(event)
+
+    def _build_dispatcher(self, event_type):
+        """Builds a dispatch closure over a snapshot of the subscribers of
+        an event type and of all its subclasses.
+
+        The snapshot keeps weak references, so subscribed objects can still
+        be collected; the closure purges dead entries and invalidates itself
+        when that happens. It stays valid until any subscriber dict mutates.
+        """
+        # Merging into a dict dedups handlers subscribed to several
+        # classes of the tree
+        merged = {}
+        for klass in self._event_tree(event_type):
+            subscribers = self._subscribers.get(klass)
+            if subscribers:
+                merged.update(subscribers)
+        if not merged:
+            return lambda event: None
+        snapshot = tuple(merged.values())
+
+        def dispatch(event):
+            # References dying between snapshot and dispatch are simply
+            # skipped here; their death callbacks queue the actual cleanup
+            for weak_handler in snapshot:
+                handler = weak_handler()
+                if handler is not None:
+                    handler(event)
+
+        return dispatch
+
+    def _event_tree(self, event_type):
+        """Yields an event class and all its subclasses, depth first."""
+        yield event_type
+        for klass in event_type.__subclasses__():
+            yield from self._event_tree(klass)
+
+    def _reap_dead(self):
+        """Drops the entries of collected handlers and the stale dispatch
+        closures.
+        """
+        dead = self._dead
+        removed = False
+        while dead:
+            event_type, key = dead.popleft()
+            subscribers = self._subscribers.get(event_type)
+            if subscribers and subscribers.pop(key, None) is not None:
+                for klass in event_type._event_mro:
+                    klass._subscriber_count -= 1
+                removed = True
+        if removed:
+            self._dispatchers.clear()
+
+    def _make_remover(self, event_type, key):
+        """Builds the death callback of a subscriber weakref.
+
+        The callback only queues the entry for removal: it may fire during
+        garbage collection at any point, so the actual cleanup waits for
+        the next drain.
+        """
+        return lambda weak_handler: self._dead.append((event_type, key))
+
+    def _make_key(self, handler):
+        """Builds a hashable identity key for a handler function or method.
+
+        Bound methods are keyed by their instance and underlying function,
+        so that two method objects wrapping the same pair compare equal
+        without dereferencing any stored weakref.
+        """
+        if type(handler) is MethodType:
+            return (id(handler.__self__), handler.__func__)
+        return (None, handler)
+
+    def _make_weakref(self, handler, callback):
+        """Builds a weakref to a handler function or method, with a death
+        callback.
+        """
+        # WeakMethod for bound methods, a plain ref otherwise
+        if type(handler) is MethodType:
+            return _weak_method(handler, callback)
+        return _ref(handler, callback)
 
 
 class Event:
@@ -105,8 +351,26 @@ class Event:
     particular event.
     """
 
+    # Events only carry their name: a slot keeps per-instance cost to a
+    # slot-array store instead of a __dict__ allocation
+    __slots__ = ('name',)
+
     manager = EventManager()
 
+    def __init_subclass__(cls, **kwargs):
+        """Caches per-subclass data the manager needs on its hot paths."""
+        super().__init_subclass__(**kwargs)
+        # The chain of Event superclasses is fixed once the class body has
+        # run, so it is computed here instead of on every subscription
+        cls._event_mro = tuple(
+            klass for klass in cls.__mro__ if issubclass(klass, Event)
+        )
+        # Small free list of event instances recycled by send
+        cls._pool = []
+        # Number of handlers subscribed to this class, maintained by the
+        # manager so that send can bail out early
+        cls._subscriber_count = 0
+
     def __init__(self):
         """Initializes new events."""
         self.name = self._generate_event_name()
@@ -121,9 +385,41 @@ class Event:
     @classmethod
     def send(cls, *args, **kargs):
         """Sends a notification to all the subscribers listening to this event.
+
+        Event instances are recycled through a small per-class pool, so
+        handlers must not keep a reference to the event object once they
+        return.
+        """
+        if cls.manager._can_skip(cls):
+            return
+        pool = cls._pool
+        # EAFP: a truthiness test before pop could race with a concurrent
+        # sender popping the last entry
+        try:
+            event = pool.pop()
+        except IndexError:
+            event = cls(*args, **kargs)
+        else:
+            event.__init__(*args, **kargs)
+        # Only dispatched events go back to the pool: an event parked on
+        # the actions queue must not be recycled while still pending
+        if cls.manager.notify(event) and len(pool) < 32:
+            pool.append(event)
+
+    @classmethod
+    def broadcast(cls):
+        """Sends this event's shared singleton instance to the subscribers.
+
+        For events that carry no payload and take no constructor
+        arguments, this skips instantiation entirely: every broadcast
+        delivers the same sentinel instance, created once per class on
+        first use.
         """
-        event = cls(*args, **kargs)
-        cls.manager.notify(event)
+        if cls.manager._can_skip(cls):
+            return
+        if '_singleton' not in cls.__dict__:
+            cls._singleton = cls()
+        cls.manager.notify(cls._singleton)
 
     @classmethod
     def subscribe(cls, handler):
@@ -141,18 +437,24 @@ class Event:
     @classmethod
     def listen(cls, func):
         """Decorator used to subscribe to an event."""
-        params = list(inspect.signature(func).parameters.keys())
-        if len(params) == 1:
+        # Reading the code object is much cheaper than inspect.signature.
+        # Callables without one (partials, builtins, callable instances)
+        # fall through to the TypeError below
+        code = getattr(func, '__code__', None)
+        nargs = code.co_argcount if code is not None else None
+        first = code.co_varnames[0] if nargs else None
+        if nargs == 1:
             # This is a normal function
             cls.subscribe(func)
-        elif len(params) == 2 and params[0] == 'self':
+        elif nargs == 2 and first == 'self':
             # This is an unbound instance function
             if not hasattr(func, "_zevents"):
                 setattr(func, "_zevents", [])
             func._zevents.append(cls)
         else:
+            name = getattr(func, '__qualname__', repr(func))
             raise TypeError(
-                f"Cannot subscribe {func.__qualname__}. Incorrect signature."
+                f"Cannot subscribe {name}. Incorrect signature."
             )
 
         return func
@@ -160,3 +462,8 @@ class Event:
     def __str__(self):
         """Converts the current event to a string representation."""
         return f'[{self.name}]'
+
+# __init_subclass__ does not run for Event itself
+Event._event_mro = (Event,)
+Event._pool = []
+Event._subscriber_count = 0
@@ -5,17 +5,42 @@
 
 from functools import wraps
 
+def _collect_marked_handlers(cls):
+    """Collects the zevent-marked methods of a class as a tuple of
+    (attribute name, events) pairs. The MRO is walked so that inherited
+    handlers are included, most derived definition first.
+    """
+    handlers = []
+    seen = set()
+    for klass in cls.__mro__:
+        for name, obj in klass.__dict__.items():
+            if name in seen:
+                continue
+            seen.add(name)
+            if hasattr(obj, "_zevents"):
+                handlers.append((name, tuple(obj._zevents)))
+    return tuple(handlers)
+
+def _marked_handlers(cls):
+    """Returns the cached handler table of a class, computing it once."""
+    if '_zevents_handlers' not in cls.__dict__:
+        cls._zevents_handlers = _collect_marked_handlers(cls)
+    return cls._zevents_handlers
+
 def _subscribe_marked_events(instance):
-    for key, obj in type(instance).__dict__.items():
-        if hasattr(obj, "_zevents"):
-            zevents = obj._zevents
-            for zevent in zevents:
-                zevent.subscribe(getattr(instance, key))
+    for name, zevents in _marked_handlers(type(instance)):
+        bound = getattr(instance, name)
+        for zevent in zevents:
+            zevent.subscribe(bound)
 
 def listener(cls):
     """Class decorator to mark a class as a zevent listener."""
     func = cls.__init__
 
+    # The handler table is computed once at decoration time so that
+    # instantiation does not re-scan the class dictionnary
+    cls._zevents_handlers = _collect_marked_handlers(cls)
+
     # Wraps the class constructor to automate the subscription of methods to
     # event handlers
     @wraps(cls.__init__)
@@ -33,4 +58,3 @@ class Listener:
     def __init__(self):
         """Subscribes bound methods to the zevents they want to listen to."""
         _subscribe_marked_events(self)
-